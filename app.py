@@ -15,13 +15,27 @@ handle concurrent database requests and includes safeguards to
 automatically recreate the pool if connections drop. It only retains
 the 100 most recently active players to limit storage usage.
 
+Each Gunicorn worker keeps a small pool (``POOL_MIN``/``POOL_MAX``,
+1 and 2 by default) so the number of PostgreSQL backends stays low as
+workers are added. For larger deployments, point ``DATABASE_URL`` at
+PgBouncer in transaction pooling mode and set
+``DB_PREPARED_STATEMENTS=0``: every statement runs in autocommit mode, so
+no transaction is held open between queries, but server-side prepared
+statements cannot follow a client across PgBouncer's backends.
+
 See templates/index.html for the HTML front‑end.
 """
 
+import atexit
 import os
+import queue
 import random
+import re
+import threading
+import time
+import weakref
 from datetime import datetime
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Set, Tuple
 
 from flask import (
     Flask,
@@ -31,8 +45,10 @@ from flask import (
     url_for,
     session,
 )
-import psycopg2
-from psycopg2 import pool, OperationalError
+import numpy as np
+from psycopg2 import OperationalError
+from psycopg2.extras import execute_values
+from psycopg2.pool import PoolError, ThreadedConnectionPool
 
 
 # ---------------------------------------------------------------------------
@@ -47,14 +63,27 @@ app.secret_key = os.environ.get("SECRET_KEY", "super‑secret‑key")
 # into your service, as noted in the Railway docs【530127382822440†L233-L248】.
 DATABASE_URL: Optional[str] = os.environ.get("DATABASE_URL")
 
+# Size of each worker's connection pool. The total number of server
+# connections is the pool size times the number of Gunicorn workers, so the
+# defaults are kept small: one connection for requests and one for the
+# background score writer. Raise ``POOL_MAX`` when running threaded
+# workers.
+POOL_MIN: int = int(os.environ.get("POOL_MIN", "1"))
+POOL_MAX: int = int(os.environ.get("POOL_MAX", "2"))
+
+# Server-side prepared statements only work when each client keeps its own
+# server session. Set ``DB_PREPARED_STATEMENTS=0`` behind PgBouncer in
+# transaction pooling mode.
+USE_PREPARED_STATEMENTS: bool = os.environ.get("DB_PREPARED_STATEMENTS", "1") != "0"
+
 # Connection pool will be created on demand. Using a pool helps ensure
 # efficient reuse of connections when handling multiple concurrent
-# requests. The pool size of (1, 10) allows up to 10 simultaneous
-# connections which is sufficient for ~50 concurrent users.
-_db_pool: Optional[pool.SimpleConnectionPool] = None
+# requests. A threaded pool is used so that connections can be shared
+# safely when Gunicorn runs threaded (gthread) workers.
+_db_pool: Optional[ThreadedConnectionPool] = None
 
 
-def get_db_pool() -> Optional[pool.SimpleConnectionPool]:
+def get_db_pool() -> Optional[ThreadedConnectionPool]:
     """Initialize (if necessary) and return the global connection pool.
 
     Returns ``None`` if the ``DATABASE_URL`` is not set or if the pool
@@ -69,20 +98,64 @@ def get_db_pool() -> Optional[pool.SimpleConnectionPool]:
     # Create the pool on first use.
     if _db_pool is None:
         try:
-            # Minimum 1 connection, maximum 10 connections in the pool.
-            _db_pool = psycopg2.pool.SimpleConnectionPool(1, 10, dsn=DATABASE_URL)
+            # Minimum POOL_MIN connections, maximum POOL_MAX in the pool.
+            _db_pool = ThreadedConnectionPool(POOL_MIN, POOL_MAX, dsn=DATABASE_URL)
         except Exception as exc:
             print(f"Error creating connection pool: {exc}")
             _db_pool = None
     return _db_pool
 
 
+# Names of the statements already prepared on each pooled connection.
+# Prepared statements live as long as the server session, so they are
+# tracked per connection object and forgotten when the connection is
+# closed and garbage collected.
+_prepared: "weakref.WeakKeyDictionary[Any, Set[str]]" = weakref.WeakKeyDictionary()
+
+
+def _execute_prepared(
+    conn: Any,
+    cur: Any,
+    name: str,
+    query: str,
+    params: Optional[tuple],
+) -> None:
+    """Run ``query`` as the server-side prepared statement ``name``.
+
+    The statement is prepared with ``PREPARE`` the first time it is used on
+    ``conn`` and then run with ``EXECUTE`` on every call, so PostgreSQL
+    parses and plans it only once per connection.
+    """
+    prepared = _prepared.setdefault(conn, set())
+    if name not in prepared:
+        cur.execute(f"PREPARE {name} AS {query}")
+        prepared.add(name)
+    if params:
+        placeholders = ", ".join(["%s"] * len(params))
+        cur.execute(f"EXECUTE {name} ({placeholders});", params)
+    else:
+        cur.execute(f"EXECUTE {name};")
+
+
+def _execute_unprepared(cur: Any, query: str, params: Optional[tuple]) -> None:
+    """Run a query written with ``$1, $2, ...`` placeholders directly.
+
+    Used instead of :func:`_execute_prepared` when prepared statements are
+    disabled. The placeholders are rewritten to psycopg2's named style.
+    """
+    query = re.sub(r"\$(\d+)", r"%(\1)s", query)
+    cur.execute(query, {str(i): value for i, value in enumerate(params or (), 1)})
+
+
 def execute_query(
     query: str,
     params: Optional[tuple] = None,
     *,
+    name: Optional[str] = None,
+    values: Optional[List[tuple]] = None,
     fetchone: bool = False,
     fetchall: bool = False,
+    raise_errors: bool = False,
 ) -> Optional[Any]:
     """Execute a SQL query using a pooled connection.
 
@@ -92,17 +165,33 @@ def execute_query(
         The SQL statement to execute.
     params : tuple or None
         Parameters to use with the SQL statement.
+    name : str or None
+        If given, run ``query`` as a server-side prepared statement with
+        this name. The query must then use PostgreSQL's ``$1, $2, ...``
+        placeholders instead of ``%s``. If ``USE_PREPARED_STATEMENTS`` is
+        False the query is sent as-is on every call.
+    values : list of tuple or None
+        If given, send all rows in one statement with
+        ``psycopg2.extras.execute_values``, so the write is applied
+        atomically even in autocommit mode. The query must contain a single
+        ``VALUES %s`` placeholder. Use this for multi-row writes instead of
+        ``executemany``, which issues one statement per row.
     fetchone : bool
         If True, return the first row of results.
     fetchall : bool
         If True, return all rows of results.
+    raise_errors : bool
+        If True, re-raise database errors instead of logging them and
+        returning None, so callers can tell a failed write from one that
+        returned nothing.
 
     Returns
     -------
     Any or None
         When ``fetchone`` is True, returns a single row (tuple) or None;
         when ``fetchall`` is True, returns a list of rows; otherwise returns
-        None.
+        None. With ``values``, ``fetchall`` returns the rows produced by a
+        ``RETURNING`` clause.
     """
     pool = get_db_pool()
     if pool is None:
@@ -110,52 +199,144 @@ def execute_query(
     conn = None
     try:
         conn = pool.getconn()
+        # Run every statement in its own transaction so no transaction is
+        # left open on the connection, as PgBouncer's transaction pooling
+        # requires.
+        if not conn.autocommit:
+            conn.autocommit = True
+        # psycopg2 always requests text-format results (it has no binary
+        # result mode); integer columns are decoded by its C typecasters,
+        # so a plain cursor is used for all queries.
         with conn.cursor() as cur:
-            cur.execute(query, params)
             result = None
-            if fetchone:
-                result = cur.fetchone()
-            elif fetchall:
-                result = cur.fetchall()
-            # Commit any changes (INSERT/UPDATE/DELETE)
-            conn.commit()
+            if values is not None:
+                # A single page keeps the write in one statement, and so
+                # in one transaction.
+                result = execute_values(
+                    cur, query, values, page_size=max(len(values), 1), fetch=fetchall
+                )
+            else:
+                if name and USE_PREPARED_STATEMENTS:
+                    _execute_prepared(conn, cur, name, query, params)
+                elif name:
+                    _execute_unprepared(cur, query, params)
+                else:
+                    cur.execute(query, params)
+                if fetchone:
+                    result = cur.fetchone()
+                elif fetchall:
+                    result = cur.fetchall()
             return result
     except OperationalError as exc:
         # Reset the pool on operational errors (e.g. network disconnects).
         global _db_pool
         _db_pool = None
+        if raise_errors:
+            raise
         print(f"OperationalError during DB operation: {exc}")
         return None
     except Exception as exc:
+        if raise_errors:
+            raise
         print(f"Database error: {exc}")
-        if conn:
-            conn.rollback()
         return None
     finally:
         if conn:
             pool.putconn(conn)
 
 
+# ---------------------------------------------------------------------------
+# Leaderboard cache
+# ---------------------------------------------------------------------------
+
+# The leaderboard is shown on every page but only changes when a game
+# finishes, so it is cached in-process for a short time. Each Gunicorn
+# worker keeps its own copy; writes made through this process invalidate
+# it immediately, and writes from other workers show up once the TTL
+# expires. The generation counter is bumped on every invalidation so that
+# a read which was already in flight does not store stale rows.
+LEADERBOARD_TTL: float = 2.0
+_lb_cache: Dict[str, Any] = {"ts": 0.0, "limit": None, "rows": None, "gen": 0}
+_lb_lock = threading.Lock()
+
+
+def _get_cached_leaderboard(limit: int) -> Optional[List[tuple]]:
+    """Return the cached leaderboard if it is fresh, otherwise None."""
+    if (
+        _lb_cache["rows"] is not None
+        and _lb_cache["limit"] == limit
+        and time.monotonic() - _lb_cache["ts"] < LEADERBOARD_TTL
+    ):
+        return _lb_cache["rows"]
+    return None
+
+
+def _get_leaderboard_generation() -> int:
+    """Return the current cache generation, to be passed back on store."""
+    return _lb_cache["gen"]
+
+
+def _set_cached_leaderboard(limit: int, rows: List[tuple], generation: int) -> None:
+    """Store a freshly queried leaderboard in the cache.
+
+    The rows are discarded if the cache was invalidated after
+    ``generation`` was read, since the query may predate that write.
+    """
+    with _lb_lock:
+        if _lb_cache["gen"] == generation:
+            _lb_cache.update(ts=time.monotonic(), limit=limit, rows=rows)
+
+
+def invalidate_leaderboard() -> None:
+    """Force the next leaderboard read to query the database."""
+    with _lb_lock:
+        _lb_cache["gen"] += 1
+        _lb_cache["ts"] = 0.0
+
+
 # ---------------------------------------------------------------------------
 # Database management helpers
 # ---------------------------------------------------------------------------
 
 
 def init_db() -> None:
-    """Create the players table if it does not exist.
+    """Create the players table and its indexes if they do not exist.
 
     This function should run once when the application starts. It creates a
     table to store player names, cumulative scores, and the timestamp of
     their last game. The name column is marked UNIQUE so we can easily
     update existing records.
+
+    The leaderboard index matches the ``ORDER BY`` of
+    :func:`get_leaderboard` and includes ``name``, so the top players are
+    read straight from the index without a sort or heap visit. The
+    ``lat_played`` index serves the ordering used by :func:`prune_players`.
+
+    Every Gunicorn worker calls this on import, so the DDL is skipped when
+    the last object it creates already exists. Otherwise the DDL runs under
+    a transaction-level advisory lock so that workers booting together on
+    a fresh database do not race each other. The statements are sent as a
+    single query string, which PostgreSQL runs as one implicit transaction
+    even in autocommit mode, so the lock covers all of them.
     """
+    row = execute_query(
+        "SELECT to_regclass('public.idx_players_last_played');",
+        fetchone=True,
+    )
+    if row and row[0]:
+        return
     query = """
+    SELECT pg_advisory_xact_lock(42);
     CREATE TABLE IF NOT EXISTS players (
         id SERIAL PRIMARY KEY,
         name TEXT UNIQUE NOT NULL,
         total_score INTEGER NOT NULL DEFAULT 0,
         lat_played TIMESTAMPTZ NOT NULL DEFAULT NOW()
     );
+    CREATE INDEX IF NOT EXISTS idx_players_leaderboard
+        ON players (total_score DESC, lat_played ASC) INCLUDE (name);
+    CREATE INDEX IF NOT EXISTS idx_players_last_played
+        ON players (lat_played DESC);
     """
     execute_query(query)
 
@@ -167,39 +348,25 @@ def get_player_score(name: str) -> Optional[int]:
     error occurs.
     """
     row = execute_query(
-        "SELECT total_score FROM players WHERE name = %s;",
+        "SELECT total_score FROM players WHERE name = $1",
         (name,),
+        name="q_player_score",
         fetchone=True,
     )
     return row[0] if row else None
 
 
-def create_player(name: str) -> None:
-    """Ensure a player record exists with an initial score of zero.
+def update_player_score(name: str, additional_points: int) -> None:
+    """Queue an increment of a player's total score.
 
-    Uses an UPSERT pattern so repeated calls are safe.
+    The update is written by the background writer thread (see
+    :func:`_writer_loop`), so the request does not wait on the database.
+    If the queue is full, the update is written synchronously instead.
     """
-    execute_query(
-        """
-        INSERT INTO players (name, total_score, lat_played)
-        VALUES (%s, 0, NOW())
-        ON CONFLICT (name) DO NOTHING;
-        """,
-        (name,),
-    )
-
-
-def update_player_score(name: str, additional_points: int) -> None:
-    """Increment a player's total score and update lat_played timestamp."""
-    execute_query(
-        """
-        UPDATE players
-        SET total_score = total_score + %s,
-            lat_played = NOW()
-        WHERE name = %s;
-        """,
-        (additional_points, name),
-    )
+    try:
+        _write_queue.put_nowait((name, additional_points))
+    except queue.Full:
+        _write_scores([(name, additional_points)])
 
 
 def get_leaderboard(limit: int = 3) -> List[tuple]:
@@ -207,19 +374,45 @@ def get_leaderboard(limit: int = 3) -> List[tuple]:
 
     If multiple players have the same score, the one who played earlier
     (smaller lat_played) appears first. Returns an empty list if there
-    are no players or if the database is unreachable.
+    are no players or if the database is unreachable. Results are served
+    from the in-process cache for up to ``LEADERBOARD_TTL`` seconds.
     """
+    cached = _get_cached_leaderboard(limit)
+    if cached is not None:
+        return cached
+    generation = _get_leaderboard_generation()
     rows = execute_query(
         """
         SELECT name, total_score
         FROM players
         ORDER BY total_score DESC, lat_played ASC
-        LIMIT %s;
+        LIMIT $1
         """,
         (limit,),
+        name="q_leaderboard",
         fetchall=True,
     )
-    return rows or []
+    if rows is None:
+        return []
+    _set_cached_leaderboard(limit, rows, generation)
+    return rows
+
+
+def merge_into_leaderboard(
+    leaderboard: List[tuple], name: str, total_score: int, limit: int = 3
+) -> List[tuple]:
+    """Return a copy of ``leaderboard`` with ``name`` at ``total_score``.
+
+    Used on the game-over page, where the finished game may still be
+    queued for the background writer. The player's entry is replaced or
+    added, and since they played most recently they rank after anyone
+    with the same score. The merged list is never cached.
+    """
+    merged = [player for player in leaderboard if player[0] != name]
+    merged.append((name, total_score))
+    # sort() is stable, so the player stays behind equal scores.
+    merged.sort(key=lambda player: -player[1])
+    return merged[:limit]
 
 
 def prune_players(max_players: int = 100) -> None:
@@ -228,48 +421,225 @@ def prune_players(max_players: int = 100) -> None:
     We retain only the most recently played 100 players by ordering on
     ``lat_played DESC``. This helps limit database size while keeping
     leaderboards meaningful. If the table is smaller than ``max_players``
-    rows, nothing is deleted.
+    rows, nothing is deleted. The rows to delete are found by skipping the
+    first ``max_players`` entries of the ``lat_played`` index, which avoids
+    the ``NOT IN`` anti-join over a materialized keep set.
     """
     execute_query(
         """
-        DELETE FROM players
-        WHERE id NOT IN (
+        DELETE FROM players p
+        USING (
             SELECT id FROM players
             ORDER BY lat_played DESC
-            LIMIT %s
-        );
+            OFFSET $1
+        ) old
+        WHERE p.id = old.id
         """,
         (max_players,),
+        name="q_prune",
     )
+    invalidate_leaderboard()
+
+
+# ---------------------------------------------------------------------------
+# Background score writer
+# ---------------------------------------------------------------------------
+
+# Finished games are queued and written by a daemon thread in each worker,
+# so game-over responses do not wait on the database. Pending updates are
+# flushed once ``WRITE_BATCH_SIZE`` games are queued or
+# ``WRITE_FLUSH_INTERVAL`` seconds after the first one arrives. Pruning
+# runs after every ``PRUNE_EVERY`` written games, since most prunes would
+# find nothing to delete, and also when each worker starts and exits so
+# that short-lived workers still enforce the limit. Anything still queued
+# when the worker exits is written by :func:`_drain_write_queue`.
+WRITE_BATCH_SIZE: int = 64
+WRITE_FLUSH_INTERVAL: float = 0.05
+PRUNE_EVERY: int = 50
+# Seconds to wait at exit for the writer thread to flush and stop.
+WRITE_DRAIN_TIMEOUT: float = 5.0
+# The pool raises instead of waiting when every connection is checked out
+# (e.g. under threaded workers with the small default ``POOL_MAX``), so
+# score writes retry for up to ``WRITE_POOL_TIMEOUT`` seconds.
+WRITE_POOL_TIMEOUT: float = 30.0
+WRITE_POOL_RETRY_DELAY: float = 0.05
+# ``None`` on the queue tells the writer thread to stop.
+_write_queue: "queue.Queue[Optional[Tuple[str, int]]]" = queue.Queue(maxsize=1024)
+# Games written since the last prune, from any thread in this worker.
+_games_since_prune: int = 0
+_prune_lock = threading.Lock()
+
+
+def _upsert_scores(rows: List[Tuple[str, int]]) -> None:
+    """Add each ``(name, points)`` row to the player's total in one UPSERT.
+
+    Player records are created on their first game. Retries while the
+    connection pool is exhausted; raises on any other failure, or with
+    ``PoolError`` if no connection frees up within ``WRITE_POOL_TIMEOUT``.
+    """
+    deadline = time.monotonic() + WRITE_POOL_TIMEOUT
+    while True:
+        try:
+            execute_query(
+                """
+                INSERT INTO players (name, total_score)
+                VALUES %s
+                ON CONFLICT (name) DO UPDATE
+                SET total_score = players.total_score + EXCLUDED.total_score,
+                    lat_played = NOW()
+                """,
+                values=rows,
+                raise_errors=True,
+            )
+            return
+        except PoolError:
+            if time.monotonic() >= deadline:
+                raise
+            time.sleep(WRITE_POOL_RETRY_DELAY)
+
+
+def _write_scores(batch: List[Tuple[str, int]]) -> None:
+    """Add the points in ``batch`` to each player's total.
+
+    The batch is written in one statement. If that fails, each player is
+    retried on their own so that one bad row (e.g. a name PostgreSQL
+    rejects) only loses that player's score, which is logged.
+    """
+    # ON CONFLICT DO UPDATE cannot touch the same row twice in one
+    # statement, so combine repeated names first. Sorting makes every
+    # worker lock rows in the same order, so concurrent batches cannot
+    # deadlock each other.
+    totals: Dict[str, int] = {}
+    for name, points in batch:
+        totals[name] = totals.get(name, 0) + points
+    rows = sorted(totals.items())
+    try:
+        _upsert_scores(rows)
+    except PoolError:
+        # Retrying row by row would only wait on the pool again.
+        print(f"Dropping score updates {rows!r}: no database connection available")
+    except Exception as exc:
+        print(f"Batch score write failed ({exc}); retrying rows one by one.")
+        for row in rows:
+            try:
+                _upsert_scores([row])
+            except Exception as row_exc:
+                print(f"Dropping score update {row!r}: {row_exc}")
+    invalidate_leaderboard()
+    _count_written_games(len(batch))
+
+
+def _count_written_games(count: int) -> None:
+    """Prune old players once ``PRUNE_EVERY`` games have been written."""
+    global _games_since_prune
+    with _prune_lock:
+        _games_since_prune += count
+        due = _games_since_prune >= PRUNE_EVERY
+        if due:
+            _games_since_prune = 0
+    if due:
+        prune_players()
+
+
+def _writer_loop() -> None:
+    """Write queued score updates in batches until told to stop."""
+    stopping = False
+    while not stopping:
+        item = _write_queue.get()
+        if item is None:
+            break
+        batch = [item]
+        deadline = time.monotonic() + WRITE_FLUSH_INTERVAL
+        while len(batch) < WRITE_BATCH_SIZE:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                item = _write_queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+            if item is None:
+                stopping = True
+                break
+            batch.append(item)
+        _write_scores(batch)
+
+
+_writer_thread = threading.Thread(target=_writer_loop, daemon=True)
+
+
+def _drain_write_queue() -> None:
+    """Write any score updates still queued when the worker exits.
+
+    The writer is a daemon thread and is killed at interpreter exit, so
+    this runs from ``atexit``. It tells the writer to stop, waits up to
+    ``WRITE_DRAIN_TIMEOUT`` seconds for it to finish its current batch,
+    and then writes anything queued after the stop signal itself. Old
+    players are pruned last, since the in-process prune counter is lost
+    with the worker.
+    """
+    try:
+        _write_queue.put(None, timeout=WRITE_DRAIN_TIMEOUT)
+    except queue.Full:
+        pass
+    else:
+        _writer_thread.join(WRITE_DRAIN_TIMEOUT)
+    if _writer_thread.is_alive():
+        print("Score writer did not stop in time; writing the queue directly.")
+    batch: List[Tuple[str, int]] = []
+    while True:
+        try:
+            item = _write_queue.get_nowait()
+        except queue.Empty:
+            break
+        if item is not None:
+            batch.append(item)
+    if batch:
+        _write_scores(batch)
+    prune_players()
 
 
 # ---------------------------------------------------------------------------
 # Game logic helpers
 # ---------------------------------------------------------------------------
 
+_rng = np.random.default_rng()
+
 
-def generate_questions(count: int = 10) -> List[Dict[str, Any]]:
+def generate_questions(
+    count: int = 10, rng: Optional[np.random.Generator] = None
+) -> List[Dict[str, Any]]:
     """Generate a list of arithmetic questions.
 
     Each question contains two numbers (0–999), an operator ('+' or
     '-'), and the correct answer. For subtraction, we ensure that the
-    result is non‑negative by swapping the numbers if necessary.
+    result is non‑negative by putting the larger number first. All
+    numbers are drawn in a single vectorized NumPy call from ``rng``, or
+    from the module-level generator if ``rng`` is None.
     """
-    questions: List[Dict[str, Any]] = []
-    for _ in range(count):
-        op = random.choice(['+', '-'])
-        if op == '+':
-            a = random.randint(0, 999)
-            b = random.randint(0, 999)
-            answer = a + b
-        else:
-            a = random.randint(0, 999)
-            b = random.randint(0, 999)
-            if b > a:
-                a, b = b, a  # swap to avoid negative results
-            answer = a - b
-        questions.append({'a': a, 'b': b, 'op': op, 'answer': answer})
-    return questions
+    if rng is None:
+        rng = _rng
+    pairs = rng.integers(0, 1000, size=(count, 2))
+    is_sub = rng.integers(0, 2, size=count) == 1
+    a = np.where(is_sub, pairs.max(axis=1), pairs[:, 0])
+    b = np.where(is_sub, pairs.min(axis=1), pairs[:, 1])
+    answers = np.where(is_sub, a - b, a + b)
+    # Convert to plain Python ints for rendering and comparison.
+    return [
+        {'a': qa, 'b': qb, 'op': '-' if sub else '+', 'answer': answer}
+        for qa, qb, sub, answer in zip(
+            a.tolist(), b.tolist(), is_sub.tolist(), answers.tolist()
+        )
+    ]
+
+
+def generate_questions_seeded(seed: int, count: int = 10) -> List[Dict[str, Any]]:
+    """Regenerate the same list of questions from ``seed``.
+
+    Only the seed is kept in the session cookie; the questions are
+    rebuilt deterministically on each request.
+    """
+    return generate_questions(count, np.random.default_rng(seed))
 
 
 # ---------------------------------------------------------------------------
@@ -280,6 +650,12 @@ def generate_questions(count: int = 10) -> List[Dict[str, Any]]:
 # existing imports and app initialization…
 
 init_db()  # call this once at import time to create the table
+prune_players()  # the prune counter starts from zero in every new worker
+
+# Start the background score writer for this worker, and write out
+# whatever it has not flushed yet when the worker exits.
+_writer_thread.start()
+atexit.register(_drain_write_queue)
 
 # remove or comment out:
 # @app.before_first_request
@@ -294,9 +670,9 @@ def index():
 
     GET requests display the form for the player's name and show the
     leaderboard. POST requests process the submitted name, initialize
-    session state for the game, and redirect to the game view.
+    session state for the game, and redirect to the game view. The
+    leaderboard is only fetched when the form is actually rendered.
     """
-    leaderboard = get_leaderboard() or []
     if request.method == 'POST':
         name = request.form.get('name', '').strip()
         if not name:
@@ -304,23 +680,24 @@ def index():
             return render_template(
                 'index.html',
                 page='login',
-                leaderboard=leaderboard,
+                leaderboard=get_leaderboard(),
                 error="Please enter your name."
             )
         # Save name and initialize session state.
         session['name'] = name
         session['session_score'] = 0
-        session['questions'] = generate_questions(10)
+        session['seed'] = random.getrandbits(63)
         session['current_index'] = 0
         session['feedback'] = None
         session['final_score'] = 0
-        # Ensure a record exists for this player
-        create_player(name)
+        # Remember the player's total so the game view can show it without
+        # querying the database. New players get a record on game-over.
+        session['total_score_base'] = get_player_score(name) or 0
         return redirect(url_for('game'))
     # GET request
     if 'name' in session and session['name']:
         return redirect(url_for('game'))
-    return render_template('index.html', page='login', leaderboard=leaderboard)
+    return render_template('index.html', page='login', leaderboard=get_leaderboard())
 
 
 @app.route('/game', methods=['GET', 'POST'])
@@ -330,10 +707,14 @@ def game():
     if 'name' not in session:
         return redirect(url_for('index'))
     name: str = session['name']
-    # Fetch the player's total score from the database (or 0 if missing).
-    total_score: int = get_player_score(name) or 0
-    leaderboard = get_leaderboard() or []
-    questions: List[Dict[str, Any]] = session.get('questions', [])
+    # The running total is the score stored at login plus the points earned
+    # in this game, so no database read is needed per question.
+    total_score_base: int = session.get('total_score_base', 0)
+    total_score: int = total_score_base + session.get('session_score', 0)
+    seed: Optional[int] = session.get('seed')
+    questions: List[Dict[str, Any]] = (
+        generate_questions_seeded(seed) if seed is not None else []
+    )
     current_index: int = session.get('current_index', 0)
     feedback: Optional[str] = session.get('feedback', None)
     final_score: int = session.get('final_score', 0)
@@ -349,6 +730,7 @@ def game():
             correct = questions[current_index]['answer']
             if user_answer is not None and user_answer == correct:
                 session['session_score'] = session.get('session_score', 0) + 1
+                total_score += 1
                 feedback = 'Correct!'
             else:
                 feedback = f"Incorrect! The correct answer was {correct}."
@@ -359,24 +741,27 @@ def game():
         # If we've answered all questions, update the player's total score
         if current_index >= len(questions):
             session_score = session.get('session_score', 0)
+            # Queue the score update; it is written in the background.
             update_player_score(name, session_score)
-            prune_players()
+            total_score = total_score_base + session_score
+            session['total_score_base'] = total_score
             # Store final score for display and reset session state for a new game
             session['final_score'] = session_score
             session['session_score'] = 0
-            session['questions'] = []
+            session.pop('seed', None)
             session['current_index'] = 0
             feedback = None
             final_score = session_score
-            # Refresh total_score and leaderboard
-            total_score = get_player_score(name) or 0
-            leaderboard = get_leaderboard() or []
+            # The score may not be written yet, so show it on the
+            # leaderboard directly.
             return render_template(
                 'index.html',
                 page='game_over',
                 final_score=final_score,
                 total_score=total_score,
-                leaderboard=leaderboard,
+                leaderboard=merge_into_leaderboard(
+                    get_leaderboard(), name, total_score
+                ),
             )
     # Determine if the game has already finished (GET after finishing)
     if not questions or current_index >= len(questions):
@@ -386,7 +771,7 @@ def game():
             page='game_over',
             final_score=final_score,
             total_score=total_score,
-            leaderboard=leaderboard,
+            leaderboard=get_leaderboard(),
         )
     # Otherwise, display the next question
     question = questions[current_index]
@@ -400,7 +785,7 @@ def game():
         question_count=question_count,
         feedback=feedback,
         total_score=total_score,
-        leaderboard=leaderboard,
+        leaderboard=get_leaderboard(),
     )
 
 